@@ -22,7 +22,9 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # connect=False defers connecting until first use, so each server worker
+    # process opens its own connection
+    _client = MongoClient(database_url, connect=False)
     db = _client[database_name]
 
 # Helper functions for common database operations
@@ -43,6 +45,22 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     result = db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
+def create_documents(collection_name: str, items: list):
+    """Insert many documents in one round-trip, keeping any created_at already set"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for data in items:
+        data_dict = data.model_dump() if isinstance(data, BaseModel) else data.copy()
+        data_dict.setdefault('created_at', now)
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    result = db[collection_name].insert_many(docs)
+    return [str(i) for i in result.inserted_ids]
+
 def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
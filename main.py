@@ -1,19 +1,50 @@
 import os
+import sys
+import array
+import json
+import hashlib
+import shutil
+import asyncio
 import io
+import itertools
 import math
 import random
 import uuid
-from datetime import datetime
+import secrets
+import time
+import functools
+import wave
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
-from fastapi import FastAPI, UploadFile, File, Form
+import aiofiles
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form, Query
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
+from bson import ObjectId
 from pydantic import BaseModel
 
-from database import db, create_document
-from schemas import GenerationRequest
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, see _sine_wave_to_wav
+    np = None
+
+try:
+    import soundfile as sf
+except (ImportError, OSError):  # pragma: no cover - needs the libsndfile shared library
+    sf = None
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional, see _render_tone
+    njit = None
+
+from database import db, create_document, create_documents
+from schemas import GenerationRequest, GenerationRequestStruct
 
 # --- App setup ---
 app = FastAPI(title="AI Music Studio API")
@@ -39,20 +70,254 @@ for d in [AUDIO_DIR, VIDEO_DIR, UPLOAD_DIR, MIDI_DIR]:
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 
 
+@app.on_event("startup")
+def ensure_indexes():
+    # History and presets are always listed newest-first
+    if db is None:
+        return
+    try:
+        # _id breaks created_at ties for get_history's seek cursor
+        db["generationrecord"].create_index([("created_at", -1), ("_id", -1)])
+        db["preset"].create_index([("created_at", -1)])
+    except Exception:
+        pass
+
+
+# History/upload records are buffered and written with insert_many instead
+# of one round-trip per request.
+INSERT_BATCH_SIZE = 100
+INSERT_FLUSH_INTERVAL = 0.25  # seconds
+# Bounded so an unreachable Mongo can't make the backlog grow without limit;
+# records are best-effort and dropped once it's full.
+INSERT_QUEUE_SIZE = 10_000
+INSERT_SHUTDOWN_TIMEOUT = 5.0  # seconds
+INSERT_QUEUE: Optional[asyncio.Queue] = None
+_flush_task: Optional[asyncio.Task] = None
+_STOP_FLUSH = object()
+
+
+def _queue_document(collection_name: str, record: Dict[str, Any]):
+    if db is None or INSERT_QUEUE is None:
+        return
+    try:
+        INSERT_QUEUE.put_nowait((collection_name, record))
+    except asyncio.QueueFull:
+        pass
+
+
+def _write_batch(batch):
+    by_collection: Dict[str, List[Dict[str, Any]]] = {}
+    for collection_name, record in batch:
+        by_collection.setdefault(collection_name, []).append(record)
+    for collection_name, records in by_collection.items():
+        try:
+            create_documents(collection_name, records)
+        except Exception:
+            pass
+
+
+async def _flush_inserts():
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await INSERT_QUEUE.get()
+        if item is _STOP_FLUSH:
+            return
+        batch = [item]
+        deadline = loop.time() + INSERT_FLUSH_INTERVAL
+        while len(batch) < INSERT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(INSERT_QUEUE.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP_FLUSH:
+                stopping = True
+                break
+            batch.append(item)
+        await asyncio.to_thread(_write_batch, batch)
+
+
+@app.on_event("startup")
+async def start_insert_flusher():
+    global INSERT_QUEUE, _flush_task
+    if db is None:
+        return
+    INSERT_QUEUE = asyncio.Queue(maxsize=INSERT_QUEUE_SIZE)
+    _flush_task = asyncio.create_task(_flush_inserts())
+
+
+@app.on_event("shutdown")
+async def stop_insert_flusher():
+    if _flush_task is None:
+        return
+    # The sentinel queues behind every pending record, so the flusher writes
+    # its in-flight batch and the rest of the queue before exiting. Bounded,
+    # since an unreachable Mongo blocks each batch for the selection timeout;
+    # whatever is left after that is dropped.
+    async def drain():
+        await INSERT_QUEUE.put(_STOP_FLUSH)
+        await _flush_task
+
+    try:
+        await asyncio.wait_for(drain(), INSERT_SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+
 # --- Utilities ---
 
-def _sine_wave_to_wav(path: str, seconds: float = 8.0, freq: float = 220.0, sample_rate: int = 44100, volume: float = 0.3):
-    import wave, struct
-    n_frames = int(seconds * sample_rate)
+# One cycle of a unit sine, indexed with a phase accumulator so synthesis
+# never evaluates sin() per sample. Size must be a power of two.
+SINE_TABLE_SIZE = 1 << 16
+_SINE_MASK = SINE_TABLE_SIZE - 1
+if np is not None:
+    _SINE_TABLE = np.sin(2 * np.pi * np.arange(SINE_TABLE_SIZE) / SINE_TABLE_SIZE).astype(np.float32)
+else:
+    _SINE_TABLE = [math.sin(2 * math.pi * i / SINE_TABLE_SIZE) for i in range(SINE_TABLE_SIZE)]
+
+
+if np is not None and njit is not None:
+    # Serial on purpose: renders already run concurrently via to_thread, and
+    # numba's parallel workqueue layer aborts on concurrent entry.
+    @njit(fastmath=True, cache=True)
+    def _render_tone(n_frames, step, amplitude, table):
+        """Interleaved int16 stereo frames, shape (n_frames, 2)"""
+        out = np.empty((n_frames, 2), np.int16)
+        for i in range(n_frames):
+            v = np.int16(amplitude * table[np.int64(i * step) & _SINE_MASK])
+            out[i, 0] = v
+            out[i, 1] = v
+        return out
+else:
+    def _render_tone(n_frames: int, step: float, amplitude: float, table):
+        """Interleaved int16 stereo frames, shape (n_frames, 2)"""
+        idx = (np.arange(n_frames, dtype=np.float64) * step).astype(np.int64) & _SINE_MASK
+        mono = (amplitude * table[idx]).astype(np.int16)
+        # C-order (n, 2) array is already interleaved L/R in memory
+        return np.repeat(mono[:, None], 2, axis=1)
+
+
+def _write_wav_frames(path, frames: bytes, sample_rate: int):
     with wave.open(path, 'w') as wf:
         wf.setnchannels(2)  # stereo
         wf.setsampwidth(2)  # 16-bit
         wf.setframerate(sample_rate)
-        for i in range(n_frames):
-            t = i / sample_rate
-            value = int(volume * 32767 * math.sin(2 * math.pi * freq * t))
-            data = struct.pack('<hh', value, value)
-            wf.writeframesraw(data)
+        wf.writeframes(frames)
+
+
+MAX_SYNTH_SECONDS = 60.0
+
+
+def _sine_wave_to_wav(path, seconds: float = 8.0, freq: float = 220.0, sample_rate: int = 44100, volume: float = 0.3):
+    seconds = min(seconds, MAX_SYNTH_SECONDS)
+    n_frames = int(seconds * sample_rate)
+    step = freq * SINE_TABLE_SIZE / sample_rate  # table entries per sample
+    amplitude = volume * 32767
+    if np is not None:
+        stereo = _render_tone(n_frames, step, amplitude, _SINE_TABLE)
+        if sf is not None:
+            sf.write(path, stereo, sample_rate, subtype='PCM_16', format='WAV')
+        else:
+            _write_wav_frames(path, stereo.astype('<i2', copy=False).tobytes(), sample_rate)
+        return
+    # Scalar fallback: pack every frame up front and write once instead
+    # of paying for a writeframesraw call per 4-byte frame.
+    values = [int(amplitude * _SINE_TABLE[int(i * step) & _SINE_MASK]) for i in range(n_frames)]
+    frames = array.array('h', itertools.chain.from_iterable(zip(values, values)))
+    if sys.byteorder == 'big':
+        frames.byteswap()  # WAV samples are little-endian
+    _write_wav_frames(path, frames.tobytes(), sample_rate)
+
+
+def _sine_wave_bytes(seconds: float = 8.0, freq: float = 220.0, sample_rate: int = 44100, volume: float = 0.3) -> bytes:
+    buf = io.BytesIO()
+    _sine_wave_to_wav(buf, seconds=seconds, freq=freq, sample_rate=sample_rate, volume=volume)
+    return buf.getvalue()
+
+
+# Stems are the same placeholder tones for every track, so render them once
+# at import and only copy the bytes out per music_id.
+STEMS: Dict[str, float] = {
+    "vocals": 440.0,
+    "drums": 120.0,
+    "bass": 55.0,
+    "piano": 261.6,
+    "synth": 329.6,
+}
+STEM_CACHE: Dict[str, bytes] = {
+    name: _sine_wave_bytes(seconds=6.0, freq=f, volume=0.25) for name, f in STEMS.items()
+}
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# Recently built stem/midi paths -> when they were last seen on disk, so
+# repeat export calls skip the stat. Bounded LRU; entries are re-checked
+# after KNOWN_FILES_TTL so files cleaned out of /tmp get rebuilt.
+KNOWN_FILES_SIZE = 4096
+KNOWN_FILES_TTL = 30.0  # seconds
+KNOWN_FILES: "OrderedDict[str, float]" = OrderedDict()
+
+
+def _remember_file(path: str):
+    KNOWN_FILES[path] = time.monotonic()
+    KNOWN_FILES.move_to_end(path)
+    if len(KNOWN_FILES) > KNOWN_FILES_SIZE:
+        KNOWN_FILES.popitem(last=False)
+
+
+async def _ensure_file(path: str, build, *args):
+    """Create path with build(path, *args) off the event loop unless it exists"""
+    seen_at = KNOWN_FILES.get(path)
+    if seen_at is not None and time.monotonic() - seen_at < KNOWN_FILES_TTL:
+        KNOWN_FILES.move_to_end(path)
+        return
+    if not os.path.exists(path):
+        await asyncio.to_thread(build, path, *args)
+    _remember_file(path)
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50 MB
+
+
+def _upload_dest(prefix: str, filename: Optional[str], default_ext: str):
+    uid = secrets.token_hex(16)
+    ext = filename.rpartition(".")[2] if filename and "." in filename else ""
+    if not ext.isalnum():  # also keeps client-supplied path separators out
+        ext = default_ext
+    return uid, f"{UPLOAD_DIR}/{prefix}_{uid}.{ext}"
+
+
+# Starlette spools the whole multipart body before the endpoint runs, so the
+# real early rejection happens here, on the declared Content-Length.
+UPLOAD_PATHS = {"/api/upload/reference", "/api/upload/voice", "/api/remix"}
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries, headers and other form fields
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.url.path in UPLOAD_PATHS:
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            return JSONResponse(status_code=413, content={"detail": "File too large"})
+    return await call_next(request)
+
+
+async def _save_upload(file: UploadFile, dest: str):
+    # Backstop for chunked requests that carry no Content-Length
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+    # Stream in chunks so memory stays bounded regardless of upload size
+    async with aiofiles.open(dest, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await out.write(chunk)
 
 
 def _random_bpm_key_style():
@@ -96,11 +361,8 @@ def test_database():
 # --- Uploads ---
 @app.post("/api/upload/reference")
 async def upload_reference(file: UploadFile = File(...)):
-    uid = str(uuid.uuid4())
-    ext = os.path.splitext(file.filename or "")[1] or ".mp3"
-    dest = os.path.join(UPLOAD_DIR, f"ref_{uid}{ext}")
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    uid, dest = _upload_dest("ref", file.filename, "mp3")
+    await _save_upload(file, dest)
 
     bpm, key, style = _random_bpm_key_style()
     record = {
@@ -108,46 +370,105 @@ async def upload_reference(file: UploadFile = File(...)):
         "stored_path": dest,
         "type": "reference",
         "analysis": {"bpm": bpm, "key": key, "style": style},
-        "created_at": datetime.utcnow(),
+        "created_at": datetime.now(timezone.utc),
     }
-    try:
-        create_document("uploadrecord", record)
-    except Exception:
-        pass
+    _queue_document("uploadrecord", record)
     return {"id": uid, "analysis": record["analysis"]}
 
 
 @app.post("/api/upload/voice")
 async def upload_voice(file: UploadFile = File(...)):
-    uid = str(uuid.uuid4())
-    ext = os.path.splitext(file.filename or "")[1] or ".wav"
-    dest = os.path.join(UPLOAD_DIR, f"voice_{uid}{ext}")
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    uid, dest = _upload_dest("voice", file.filename, "wav")
+    await _save_upload(file, dest)
 
     return {"id": uid, "voice_id": f"voice_custom_{uid[:8]}", "message": "Voice uploaded (simulated)"}
 
 
 # --- Music generation (simulated) ---
-@app.post("/api/generate/music", response_model=GenerationResponse)
-async def generate_music(req: GenerationRequest):
+# Identical requests render identical audio, so remember the file rendered
+# for each request payload (LRU) and hardlink it for repeat ids.
+GEN_CACHE_SIZE = 512
+GEN_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+
+# strict=False keeps Pydantic's lax coercion (e.g. "bpm": "120")
+_generation_decoder = msgspec.json.Decoder(GenerationRequestStruct, strict=False)
+
+
+def _inline_schema_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            return _inline_schema_refs(defs[ref.rsplit("/", 1)[1]], defs)
+        return {k: _inline_schema_refs(v, defs) for k, v in schema.items() if k != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_schema_refs(v, defs) for v in schema]
+    return schema
+
+
+def _generation_request_openapi() -> Dict[str, Any]:
+    # The body isn't a FastAPI parameter, so document it by hand
+    schema = GenerationRequest.model_json_schema()
+    schema = _inline_schema_refs(schema, schema.get("$defs", {}))
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+def _validation_error(exc: msgspec.DecodeError) -> RequestValidationError:
+    """Wrap a msgspec error in FastAPI's usual 422 error list"""
+    # msgspec's message text isn't a stable API, so don't parse a loc out of it
+    return RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(exc)}])
+
+
+def _generation_key(settings: Dict[str, Any]) -> str:
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _link_audio(src: str, dest: str) -> bool:
+    """Point dest at an already rendered file; False if src is gone"""
+    try:
+        os.link(src, dest)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            shutil.copyfile(src, dest)
+        except FileNotFoundError:
+            return False
+    return True
+
+
+@app.post("/api/generate/music", response_model=GenerationResponse, openapi_extra=_generation_request_openapi())
+async def generate_music(request: Request):
+    # Decoded with msgspec rather than FastAPI's Pydantic body parsing;
+    # the shape matches schemas.GenerationRequest.
+    try:
+        req = _generation_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise _validation_error(e)
+    settings = msgspec.to_builtins(req)
     uid = str(uuid.uuid4())
     freq = 110.0 + (req.bpm - 40) * 1.5 if req.bpm else 220.0
     audio_path = os.path.join(AUDIO_DIR, f"{uid}.wav")
-    _sine_wave_to_wav(audio_path, seconds=10.0, freq=freq)
+    cache_key = _generation_key(settings)
+    cached_path = GEN_CACHE.get(cache_key)
+    if cached_path is None or not await asyncio.to_thread(_link_audio, cached_path, audio_path):
+        await asyncio.to_thread(_sine_wave_to_wav, audio_path, seconds=10.0, freq=freq)
+        cached_path = audio_path
+    GEN_CACHE[cache_key] = cached_path
+    GEN_CACHE.move_to_end(cache_key)
+    if len(GEN_CACHE) > GEN_CACHE_SIZE:
+        GEN_CACHE.popitem(last=False)
 
     # Save history
     record = {
         "prompt": req.prompt,
-        "settings": req.model_dump(),
+        "settings": settings,
         "audio_path": audio_path,
         "audio_format": "wav",
-        "created_at": datetime.utcnow(),
+        "created_at": datetime.now(timezone.utc),
     }
-    try:
-        create_document("generationrecord", record)
-    except Exception:
-        pass
+    _queue_document("generationrecord", record)
 
     return GenerationResponse(
         id=uid,
@@ -169,54 +490,75 @@ async def generate_video(prompt: str = Form(...), music_id: Optional[str] = Form
 
 # --- Exports ---
 @app.get("/api/export/audio/{music_id}.{ext}")
-async def export_audio(music_id: str, ext: str):
+async def export_audio(music_id: str, ext: str, redirect: bool = False):
     wav_path = os.path.join(AUDIO_DIR, f"{music_id}.wav")
-    if not os.path.exists(wav_path):
+    try:
+        # Reuse this stat for the response so Starlette doesn't stat again
+        stat_result = os.stat(wav_path)
+    except FileNotFoundError:
         return JSONResponse(status_code=404, content={"error": "Audio not found"})
+    if redirect:
+        # Opt-in for clients that want the cacheable static URL; the
+        # download is then named {music_id}.wav
+        return RedirectResponse(url=f"/static/audio/{music_id}.wav", status_code=302)
     # For demo, return WAV regardless of requested ext
     filename = f"track_{music_id}.{ext}"
-    return FileResponse(wav_path, media_type="audio/wav", filename=filename)
+    return FileResponse(wav_path, media_type="audio/wav", filename=filename, stat_result=stat_result)
 
 
 @app.get("/api/export/stems/{music_id}")
 async def export_stems(music_id: str):
-    # Create a few alternate sine waves as stems
-    stems = {
-        "vocals": 440.0,
-        "drums": 120.0,
-        "bass": 55.0,
-        "piano": 261.6,
-        "synth": 329.6,
-    }
     urls: Dict[str, str] = {}
-    for name, f in stems.items():
+    for name in STEMS:
         p = os.path.join(AUDIO_DIR, f"{music_id}_{name}.wav")
-        if not os.path.exists(p):
-            _sine_wave_to_wav(p, seconds=6.0, freq=f, volume=0.25)
+        await _ensure_file(p, _write_bytes, STEM_CACHE[name])
         urls[name] = f"/static/audio/{music_id}_{name}.wav"
     return {"id": music_id, "stems": urls}
 
 
+def _write_midi(path: str):
+    with open(path, "w") as f:
+        f.write("MIDI DEMO\nC4:1 D4:1 E4:2 G4:2 C5:4\n")
+
+
 @app.get("/api/export/midi/{music_id}")
 async def export_midi(music_id: str):
     # Create a tiny pseudo-MIDI TXT for demo
     midi_txt = os.path.join(MIDI_DIR, f"{music_id}.mid.txt")
-    if not os.path.exists(midi_txt):
-        with open(midi_txt, "w") as f:
-            f.write("MIDI DEMO\nC4:1 D4:1 E4:2 G4:2 C5:4\n")
+    await _ensure_file(midi_txt, _write_midi)
     return {"id": music_id, "midi_url": f"/static/midi/{music_id}.mid.txt"}
 
 
 # --- History & presets ---
+# Only the fields the history list renders; settings can be large
+HISTORY_FIELDS = {"prompt": 1, "audio_path": 1, "audio_format": 1, "created_at": 1}
+
+
 @app.get("/api/history")
-async def get_history(limit: int = 20):
+async def get_history(limit: int = 20, before: Optional[datetime] = None, before_id: Optional[str] = None):
+    # Seek pagination: pass the last item's created_at and _id as
+    # `before`/`before_id` for the next page. Timestamps only have
+    # millisecond precision, so _id breaks ties.
+    query: Dict[str, Any] = {}
+    if before_id is not None and before is None:
+        return JSONResponse(status_code=422, content={"error": "before_id requires before"})
+    if before is not None and before_id is not None:
+        if not ObjectId.is_valid(before_id):
+            return JSONResponse(status_code=422, content={"error": "Invalid before_id"})
+        query = {"$or": [
+            {"created_at": {"$lt": before}},
+            {"created_at": before, "_id": {"$lt": ObjectId(before_id)}},
+        ]}
+    elif before is not None:
+        query = {"created_at": {"$lt": before}}
     try:
-        docs = db["generationrecord"].find().sort("created_at", -1).limit(limit)
-        items = []
-        for d in docs:
-            d["_id"] = str(d.get("_id"))
-            items.append(d)
-        return {"items": items}
+        docs = (
+            db["generationrecord"]
+            .find(query, HISTORY_FIELDS)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit)
+        )
+        return {"items": [{**d, "_id": str(d["_id"])} for d in docs]}
     except Exception:
         return {"items": []}
 
@@ -229,7 +571,7 @@ class PresetModel(BaseModel):
 @app.post("/api/presets")
 async def create_preset(preset: PresetModel):
     try:
-        pid = create_document("preset", {**preset.model_dump(), "created_at": datetime.utcnow()})
+        pid = create_document("preset", {**preset.model_dump(), "created_at": datetime.now(timezone.utc)})
         return {"id": pid}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -250,57 +592,65 @@ async def list_presets():
 
 # --- Theory helpers ---
 NOTES_SHARP = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+NOTE_IDX = {n: i for i, n in enumerate(NOTES_SHARP)}
+MAJOR_STEPS = (2, 2, 1, 2, 2, 2, 1)
+MINOR_STEPS = (2, 1, 2, 2, 1, 2, 2)
 
 
+@functools.lru_cache(maxsize=64)
 def build_scale(key: str):
     try:
         tonic, quality = key.split()
     except ValueError:
         tonic, quality = key, "Major"
-    if tonic not in NOTES_SHARP:
+    if tonic not in NOTE_IDX:
         tonic = "C"
-    major_steps = [2, 2, 1, 2, 2, 2, 1]
-    minor_steps = [2, 1, 2, 2, 1, 2, 2]
-    steps = major_steps if quality.lower().startswith("maj") else minor_steps
-    idx = NOTES_SHARP.index(tonic)
+    steps = MAJOR_STEPS if quality.lower().startswith("maj") else MINOR_STEPS
+    idx = NOTE_IDX[tonic]
     scale = [tonic]
     for s in steps[:-1]:
         idx = (idx + s) % 12
         scale.append(NOTES_SHARP[idx])
-    return scale
+    # Tuple so the cached value can't be mutated by callers
+    return tuple(scale)
 
 
-@app.get("/api/generate/chords")
-async def generate_chords(key: str = "C Major"):
+def chord_progression(key: str):
     scale = build_scale(key)
     degrees = [0, 5, 3, 4]  # I, vi, IV, V in index terms (approx)
-    prog = [f"{scale[d]}{'' if d in [0,3,4] else 'm'}" for d in degrees]
+    return [f"{scale[d]}{'' if d in [0,3,4] else 'm'}" for d in degrees]
+
+
+ALL_KEYS = [f"{n} {q}" for n in NOTES_SHARP for q in ("Major", "Minor")]
+CHORD_PROGRESSIONS: Dict[str, List[str]] = {key: chord_progression(key) for key in ALL_KEYS}
+
+
+@app.get("/api/generate/chords")
+async def generate_chords(key: str = "C Major"):
+    prog = CHORD_PROGRESSIONS.get(key) or chord_progression(key)
     return {"key": key, "progression": prog}
 
 
 @app.get("/api/generate/melody")
-async def generate_melody(key: str = "C Major", bars: int = 2, bpm: int = 90):
+async def generate_melody(key: str = "C Major", bars: int = Query(2, ge=1, le=32), bpm: int = 90):
     scale = build_scale(key)
-    melody = []
-    for _ in range(bars * 4):  # 4 notes per bar
-        n = random.choice(scale)
-        dur = random.choice([0.5, 1.0, 1.0, 2.0])
-        melody.append({"note": n + str(random.choice([4, 5])), "duration": dur})
+    n = bars * 4  # 4 notes per bar
+    notes = random.choices(scale, k=n)
+    octaves = random.choices([4, 5], k=n)
+    durations = random.choices([0.5, 1.0, 1.0, 2.0], k=n)
+    melody = [{"note": f"{note}{octave}", "duration": dur} for note, octave, dur in zip(notes, octaves, durations)]
     return {"key": key, "bpm": bpm, "melody": melody}
 
 
 # --- Remix ---
 @app.post("/api/remix")
 async def remix(style: str = Form(...), file: UploadFile = File(...)):
-    uid = str(uuid.uuid4())
-    ext = os.path.splitext(file.filename or "")[1] or ".mp3"
-    dest = os.path.join(UPLOAD_DIR, f"remix_{uid}{ext}")
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    uid, dest = _upload_dest("remix", file.filename, "mp3")
+    await _save_upload(file, dest)
 
     # Produce a new audio placeholder
     out = os.path.join(AUDIO_DIR, f"{uid}.wav")
-    _sine_wave_to_wav(out, seconds=8.0, freq=random.choice([200, 240, 300]))
+    await asyncio.to_thread(_sine_wave_to_wav, out, seconds=8.0, freq=random.choice([200, 240, 300]))
     return {"id": uid, "style": style, "audio_url": f"/static/audio/{uid}.wav"}
 
 
@@ -317,4 +667,7 @@ async def master_track(music_id: str = Form(...), preset: str = Form("Clean Bala
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Workers need the import string; each process builds its own caches and Mongo client.
+    # "auto" picks uvloop/httptools when installed and falls back otherwise.
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, loop="auto", http="auto")
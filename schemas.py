@@ -5,8 +5,10 @@ Each Pydantic model represents a collection in MongoDB.
 Collection name = lowercase of class name.
 """
 from __future__ import annotations
+import msgspec
+import msgspec.inspect
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any
+from typing import Annotated, List, Optional, Literal, Dict, Any
 
 # ---------- Core domain models ----------
 
@@ -95,3 +97,94 @@ class Product(BaseModel):
     price: float
     category: str
     in_stock: bool = True
+
+# ---------- Fast request decoding (msgspec) ----------
+# msgspec mirrors of GenerationRequest for the hot /api/generate/music path.
+# Fields, defaults and bounds must match the Pydantic models above;
+# _check_struct_mirrors enforces this at import.
+
+Unit = Annotated[float, msgspec.Meta(ge=0.0, le=1.0)]
+Pan = Annotated[float, msgspec.Meta(ge=-1.0, le=1.0)]
+Semitones = Annotated[float, msgspec.Meta(ge=-12.0, le=12.0)]
+Bpm = Annotated[int, msgspec.Meta(ge=40, le=200)]
+
+class InstrumentSettingsStruct(msgspec.Struct):
+    type: InstrumentType
+    name: Optional[str] = None
+    volume: Unit = 0.8
+    pan: Pan = 0.0
+    eq_low: Semitones = 0.0
+    eq_mid: Semitones = 0.0
+    eq_high: Semitones = 0.0
+    reverb: Unit = 0.1
+    delay: Unit = 0.0
+    kick_intensity: Optional[Unit] = None
+    snare_type: Optional[str] = None
+    hihat_pattern: Optional[str] = None
+    bass_type: Optional[Literal["808", "sub", "plucked"]] = None
+    distortion: Optional[Unit] = None
+    synth_type: Optional[Literal["pad", "lead", "pluck"]] = None
+    modulation: Optional[Unit] = None
+
+class VoiceSettingsStruct(msgspec.Struct):
+    voice_id: str = "ai_voice_female_01"
+    gender: Optional[Literal["male", "female", "neutral"]] = None
+    reverb: Unit = 0.1
+    echo: Unit = 0.0
+    autotune: Unit = 0.2
+    pitch_shift: Semitones = 0.0
+
+class LoopOptionsStruct(msgspec.Struct):
+    intro: bool = True
+    verse: bool = True
+    chorus: bool = True
+    drop: bool = False
+    outro: bool = True
+
+class GenerationRequestStruct(msgspec.Struct):
+    prompt: str
+    lyrics: Optional[str] = None
+    style: Optional[str] = "LoFi"
+    bpm: Bpm = 90
+    key: Optional[str] = "C Minor"
+    mood: Optional[str] = "Chill"
+    instruments: List[InstrumentSettingsStruct] = msgspec.field(default_factory=list)
+    voice: Optional[VoiceSettingsStruct] = None
+    mastering_preset: Optional[str] = "Clean Balanced Master"
+    loop_options: LoopOptionsStruct = msgspec.field(default_factory=LoopOptionsStruct)
+    reference_upload_id: Optional[str] = None
+
+_STRUCT_MIRRORS = (
+    (InstrumentSettingsStruct, InstrumentSettings),
+    (VoiceSettingsStruct, VoiceSettings),
+    (LoopOptionsStruct, LoopOptions),
+    (GenerationRequestStruct, GenerationRequest),
+)
+
+def _numeric_bounds(t) -> tuple:
+    # Optional[X] is a union with None; the bounds live on X
+    if isinstance(t, msgspec.inspect.UnionType):
+        t = next(u for u in t.types if not isinstance(u, msgspec.inspect.NoneType))
+    return getattr(t, "ge", None), getattr(t, "le", None)
+
+def _check_struct_mirrors():
+    """Fail at import if a msgspec mirror drifts from its Pydantic model"""
+    for struct, model in _STRUCT_MIRRORS:
+        s_fields = {f.name: f for f in msgspec.inspect.type_info(struct).fields}
+        m_fields = model.model_fields
+        if list(s_fields) != list(m_fields):
+            raise TypeError(f"{struct.__name__} fields {list(s_fields)} != {model.__name__} fields {list(m_fields)}")
+        for name, mf in m_fields.items():
+            sf = s_fields[name]
+            if sf.required != mf.is_required():
+                raise TypeError(f"{struct.__name__}.{name}: required mismatch with {model.__name__}")
+            if (sf.default_factory is msgspec.NODEFAULT) != (mf.default_factory is None):
+                raise TypeError(f"{struct.__name__}.{name}: default_factory mismatch with {model.__name__}")
+            if not mf.is_required() and mf.default_factory is None and sf.default != mf.default:
+                raise TypeError(f"{struct.__name__}.{name}: default {sf.default!r} != {mf.default!r}")
+            ge = next((m.ge for m in mf.metadata if hasattr(m, "ge")), None)
+            le = next((m.le for m in mf.metadata if hasattr(m, "le")), None)
+            if _numeric_bounds(sf.type) != (ge, le):
+                raise TypeError(f"{struct.__name__}.{name}: bounds {_numeric_bounds(sf.type)} != {(ge, le)}")
+
+_check_struct_mirrors()
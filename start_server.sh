@@ -15,5 +15,11 @@ mkdir -p logs
 echo "Installing dependencies..."
 pip install -r requirements.txt
 echo "Starting FastAPI server..."
-nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
+# --reload can't be combined with --workers; set RELOAD=1 for a single
+# auto-reloading dev process.
+if [ "${RELOAD:-0}" = "1" ]; then
+  nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
+else
+  nohup uvicorn main:app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-$(nproc)}" > logs/server.log 2>&1 
+fi
 echo "Server started in background"